@@ -7,6 +7,7 @@ RESPONDER_MODEL = "qwen3:1.7b"
 OLLAMA_URL = "http://localhost:11434/api"
 LOCAL_ROUTER_PATH = "./merged_model"
 HF_ROUTER_REPO = "nlouis/pocket-ai-router"  # Hugging Face repo for auto-download
+ROUTER_QUANTIZATION = None  # None, "8bit" or "4bit" (bitsandbytes, CUDA only)
 MAX_HISTORY = 20
 
 # --- TTS Configuration ---
@@ -34,6 +34,9 @@ class BrowserAgent(QObject):
         )
         self.running = False
         self.history = []
+        # Last captured frame and its base64 form, reused while the page is static
+        self._last_screenshot = None
+        self._last_screenshot_b64 = None
 
     def start_task(self, instruction: str):
         # Unload Qwen model to free VRAM for VLM
@@ -43,6 +46,8 @@ class BrowserAgent(QObject):
         
         self.running = True
         self.history = []
+        self._last_screenshot = None
+        self._last_screenshot_b64 = None
         
         try:
             self.controller.start()
@@ -72,13 +77,21 @@ class BrowserAgent(QObject):
     def _run_loop(self):
         while self.running:
             # 1. Capture Screenshot
-            b64_img = self.controller.get_screenshot()
-            if not b64_img:
+            img_bytes = self.controller.capture_screenshot()
+            if not img_bytes:
                 time.sleep(1)
                 continue
 
-            # Update GUI with screenshot
-            self._emit_screenshot(b64_img)
+            if img_bytes == self._last_screenshot:
+                # Page hasn't changed (e.g. a no-op click or a reprompt): reuse the
+                # previous encoding, and the GUI already shows this frame.
+                b64_img = self._last_screenshot_b64
+            else:
+                b64_img = base64.b64encode(img_bytes).decode("ascii")
+                self._last_screenshot = img_bytes
+                self._last_screenshot_b64 = b64_img
+                # Update GUI with screenshot
+                self._emit_screenshot(img_bytes)
 
             # 2. Append screenshot to the LAST user message or as a new user message
             # Qwen VL expects image input.
@@ -101,14 +114,15 @@ class BrowserAgent(QObject):
             # Or formatted in text? Ollama VLM support usually expects "images": [b64]
             
             # Prepare messages for Ollama
-            ollama_messages = []
-            for msg in self.history:
-                # Copy message to avoid mutating history directly with ephemeral data if needed
-                m = msg.copy()
-                if m["role"] == "user" and msg is self.history[-1]:
-                    # Attach current screenshot to the LATEST user message (which triggers the assistant)
-                    m["images"] = [b64_img]
-                ollama_messages.append(m)
+            # Earlier turns are passed through untouched (they are only serialized), so the
+            # request keeps a stable prefix; only the latest user message is copied to carry
+            # the current screenshot without mutating history.
+            ollama_messages = self.history[:-1]
+            last_msg = self.history[-1]
+            if last_msg["role"] == "user":
+                # Attach current screenshot to the LATEST user message (which triggers the assistant)
+                last_msg = {**last_msg, "images": [b64_img]}
+            ollama_messages.append(last_msg)
 
             # 3. Stream Response
             action_data = None
@@ -190,12 +204,10 @@ class BrowserAgent(QObject):
                     # Reprompt anyway?
                     time.sleep(1)
 
-    def _emit_screenshot(self, b64_str):
+    def _emit_screenshot(self, img_bytes):
         try:
-            # Convert base64 to QImage
-            # QImage.fromData expects bytes
-            img_data = base64.b64decode(b64_str)
-            image = QImage.fromData(img_data)
+            # QImage.fromData decodes the raw JPEG bytes directly
+            image = QImage.fromData(img_bytes)
             self.screenshot_updated.emit(image)
         except Exception as e:
             print(f"Image conversion error: {e}")
@@ -203,3 +215,4 @@ class BrowserAgent(QObject):
 
     def cleanup(self):
         self.controller.stop()
+        self.client.close()
@@ -1,6 +1,6 @@
-import base64
 import time
 from playwright.sync_api import sync_playwright, Page, BrowserContext, Browser
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 class BrowserController:
     """
@@ -21,6 +21,23 @@ class BrowserController:
         self.model_width = 1000
         self.model_height = 1000
 
+        # Action name -> handler, resolved once instead of walking an if/elif chain per step
+        self._action_handlers = {
+            "mouse_move": self._mouse_move,
+            "left_click": self._left_click,
+            "left_click_drag": self._left_click_drag,
+            "right_click": self._right_click,
+            "middle_click": self._middle_click,
+            "double_click": self._double_click,
+            "triple_click": self._triple_click,
+            "type": self._type,
+            "key": self._key,
+            "scroll": self._scroll,
+            "hscroll": self._hscroll,
+            "navigate": self._navigate,
+            "wait": self._wait,
+        }
+
     def start(self):
         """Starts the Playwright browser session."""
         if self.playwright:
@@ -55,13 +72,14 @@ class BrowserController:
         self.browser = None
         self.playwright = None
 
-    def get_screenshot(self) -> str:
-        """Returns the current page screenshot as a base64 string."""
+    def capture_screenshot(self) -> bytes:
+        """Returns the current page screenshot as raw JPEG bytes."""
         if not self.page:
-            return ""
+            return b""
         
-        screenshot_bytes = self.page.screenshot(type="jpeg", quality=70)
-        return base64.b64encode(screenshot_bytes).decode("utf-8")
+        # Freeze CSS animations so captures are cheaper and static pages yield identical
+        # bytes (letting the agent skip re-encoding/emitting them); the caret is hidden by default
+        return self.page.screenshot(type="jpeg", quality=70, animations="disabled")
 
     def _scale_coordinates(self, x: int, y: int):
         """Scales 1000x1000 coordinates to the actual viewport size."""
@@ -83,108 +101,116 @@ class BrowserController:
         # Bring browser to front if possible (OS dependent, but good for local debugging)
         # self.page.bring_to_front()
 
-        if action_name == "mouse_move":
-            coords = params.get("coordinate")
-            if coords:
-                x, y = self._scale_coordinates(coords[0], coords[1])
-                self.page.mouse.move(x, y)
-
-        elif action_name == "left_click":
-            coords = params.get("coordinate")
-            if coords:
-                x, y = self._scale_coordinates(coords[0], coords[1])
-                self.page.mouse.click(x, y)
-
-        elif action_name == "left_click_drag":
-            # "Click and drag the cursor to a specified (x, y) pixel coordinate"
-            # We assume this means dragging FROM current position TO the new position.
-            coords = params.get("coordinate")
-            if coords:
-                x, y = self._scale_coordinates(coords[0], coords[1])
-                # 1. Mouse down at current location
-                self.page.mouse.down()
-                # 2. Move to new (x,y)
-                self.page.mouse.move(x, y, steps=10) # steps makes it smoother/more human-like
-                # 3. Mouse up
-                self.page.mouse.up()
-
-        elif action_name == "right_click":
-            coords = params.get("coordinate")
-            if coords:
-                x, y = self._scale_coordinates(coords[0], coords[1])
-                self.page.mouse.click(x, y, button="right")
-
-        elif action_name == "middle_click":
-            coords = params.get("coordinate")
-            if coords:
-                x, y = self._scale_coordinates(coords[0], coords[1])
-                self.page.mouse.click(x, y, button="middle")
-
-        elif action_name == "double_click":
-            coords = params.get("coordinate")
-            if coords:
-                x, y = self._scale_coordinates(coords[0], coords[1])
-                self.page.mouse.dblclick(x, y)
-
-        elif action_name == "triple_click":
-            coords = params.get("coordinate")
-            if coords:
-                x, y = self._scale_coordinates(coords[0], coords[1])
-                self.page.mouse.click(x, y, click_count=3)
-
-        elif action_name == "type":
-            text = params.get("text")
-            if text:
-                # We type into the currently focused element
-                self.page.keyboard.type(text)
-
-        elif action_name == "key":
-            keys = params.get("keys") # Expecting formatted keys like 'Enter', 'Control+C'
-            if keys:
-                # Playwright expects single string for 'press', e.g. 'Enter'
-                # If Qwen sends a list, we iterate
-                if isinstance(keys, list):
-                    for k in keys:
-                        # Map some common keys if necessary, Playwright is usually good
-                        # Qwen might send 'Return', Playwright wants 'Enter'
-                        if k.lower() == "return": k = "Enter"
-                        self.page.keyboard.press(k)
-                else:
-                    self.page.keyboard.press(keys)
-
-        elif action_name == "scroll":
-            pixels = params.get("pixels", 0)
-            if pixels:
-                # Qwen: Positive = scroll up (content moves down).
-                # Playwright: Negative delta_y = scroll up.
-                self.page.mouse.wheel(0, -pixels)
-
-        elif action_name == "hscroll":
-            pixels = params.get("pixels", 0)
-            if pixels:
-                # Qwen: Positive = scroll? Usage not fully defined but likely consistent.
-                # Assuming positive = scroll right? Or same "up/down" logic applied to horizontal?
-                # Cookbook: "Positive values scroll up, negative values scroll down... Required only by `action=scroll` and `action=hscroll`"
-                # "Scroll up" for horizontal usually means "Scroll Left" (content moves right).
-                # Playwright: delta_x > 0 is scroll right, < 0 is scroll left.
-                # If "Up" ~ "Left", then Positive -> Negative delta_x.
-                self.page.mouse.wheel(-pixels, 0)
-        
-        elif action_name == "navigate":
-            url = params.get("url")
-            if url:
-                self.goto(url)
-
-        elif action_name == "wait":
-            duration = params.get("time", 1.0)
-            time.sleep(duration)
-
-        elif action_name == "terminate":
-            # handled by agent loop
-            pass
+        # 'terminate' is handled by the agent loop; unknown actions are ignored
+        handler = self._action_handlers.get(action_name)
+        if handler:
+            handler(params)
+
+    def _mouse_move(self, params: dict):
+        coords = params.get("coordinate")
+        if coords:
+            x, y = self._scale_coordinates(coords[0], coords[1])
+            self.page.mouse.move(x, y)
+
+    def _left_click(self, params: dict):
+        coords = params.get("coordinate")
+        if coords:
+            x, y = self._scale_coordinates(coords[0], coords[1])
+            self.page.mouse.click(x, y)
+
+    def _left_click_drag(self, params: dict):
+        # "Click and drag the cursor to a specified (x, y) pixel coordinate"
+        # We assume this means dragging FROM current position TO the new position.
+        coords = params.get("coordinate")
+        if coords:
+            x, y = self._scale_coordinates(coords[0], coords[1])
+            # 1. Mouse down at current location
+            self.page.mouse.down()
+            # 2. Move to new (x,y)
+            self.page.mouse.move(x, y, steps=10) # steps makes it smoother/more human-like
+            # 3. Mouse up
+            self.page.mouse.up()
+
+    def _right_click(self, params: dict):
+        coords = params.get("coordinate")
+        if coords:
+            x, y = self._scale_coordinates(coords[0], coords[1])
+            self.page.mouse.click(x, y, button="right")
+
+    def _middle_click(self, params: dict):
+        coords = params.get("coordinate")
+        if coords:
+            x, y = self._scale_coordinates(coords[0], coords[1])
+            self.page.mouse.click(x, y, button="middle")
+
+    def _double_click(self, params: dict):
+        coords = params.get("coordinate")
+        if coords:
+            x, y = self._scale_coordinates(coords[0], coords[1])
+            self.page.mouse.dblclick(x, y)
+
+    def _triple_click(self, params: dict):
+        coords = params.get("coordinate")
+        if coords:
+            x, y = self._scale_coordinates(coords[0], coords[1])
+            self.page.mouse.click(x, y, click_count=3)
+
+    def _type(self, params: dict):
+        text = params.get("text")
+        if text:
+            # We type into the currently focused element
+            self.page.keyboard.type(text)
+
+    def _key(self, params: dict):
+        keys = params.get("keys") # Expecting formatted keys like 'Enter', 'Control+C'
+        if keys:
+            # Playwright expects single string for 'press', e.g. 'Enter'
+            # If Qwen sends a list, we iterate
+            if isinstance(keys, list):
+                for k in keys:
+                    # Map some common keys if necessary, Playwright is usually good
+                    # Qwen might send 'Return', Playwright wants 'Enter'
+                    if k.lower() == "return": k = "Enter"
+                    self.page.keyboard.press(k)
+            else:
+                self.page.keyboard.press(keys)
+
+    def _scroll(self, params: dict):
+        pixels = params.get("pixels", 0)
+        if pixels:
+            # Qwen: Positive = scroll up (content moves down).
+            # Playwright: Negative delta_y = scroll up.
+            self.page.mouse.wheel(0, -pixels)
+
+    def _hscroll(self, params: dict):
+        pixels = params.get("pixels", 0)
+        if pixels:
+            # Qwen: Positive = scroll? Usage not fully defined but likely consistent.
+            # Assuming positive = scroll right? Or same "up/down" logic applied to horizontal?
+            # Cookbook: "Positive values scroll up, negative values scroll down... Required only by `action=scroll` and `action=hscroll`"
+            # "Scroll up" for horizontal usually means "Scroll Left" (content moves right).
+            # Playwright: delta_x > 0 is scroll right, < 0 is scroll left.
+            # If "Up" ~ "Left", then Positive -> Negative delta_x.
+            self.page.mouse.wheel(-pixels, 0)
+
+    def _navigate(self, params: dict):
+        url = params.get("url")
+        if url:
+            self.goto(url)
+
+    def _wait(self, params: dict):
+        duration = params.get("time", 1.0)
+        time.sleep(duration)
 
     def goto(self, url: str):
         if self.page:
             if not url.startswith("http"):
                 url = "https://" + url
-            self.page.goto(url)
+            # Return once the response is committed instead of waiting for the
+            # full 'load' event; the agent already pauses before the next capture.
+            self.page.goto(url, wait_until="commit")
+            try:
+                # Give the DOM a bounded chance to parse so the screenshot isn't blank
+                self.page.wait_for_load_state("domcontentloaded", timeout=5000)
+            except PlaywrightTimeoutError:
+                pass  # Slow page; capture whatever has rendered so far
@@ -1,10 +1,36 @@
 import json
 import re
 import requests
-from typing import List, Dict, Any, Generator
+from itertools import chain
+from typing import List, Dict, Any, Generator, Iterator
 
 from core.settings_store import settings as app_settings
 
+# orjson parses the streamed NDJSON lines straight from bytes; fall back to stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+# Debug flag - set to True to dump the full thinking/response text for every step
+DEBUG_VLM = False
+
+# Matches the payload of a <tool_call>...</tool_call> block
+_TOOL_CALL_RE = re.compile(r"<tool_call>\s*(.*?)\s*</tool_call>", re.DOTALL)
+
+# Curly quotes the model sometimes emits instead of JSON double quotes
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"'})
+
 class VLMClient:
     """
     Client for interacting with Qwen3-VL (or similar) models via Ollama.
@@ -15,6 +41,12 @@ class VLMClient:
         self.model_name = model_name or app_settings.get("models.web_agent", "qwen3-vl:4b")
         self.base_url = base_url or app_settings.get("ollama_url", "http://localhost:11434")
         self.model_params = model_params or app_settings.get("web_agent_params", {})
+        # Persistent session so each agent step reuses the pooled Ollama connection
+        self.http_session = requests.Session()
+
+    def close(self):
+        """Releases pooled HTTP connections."""
+        self.http_session.close()
 
     def construct_system_prompt(self) -> str:
         """
@@ -97,24 +129,28 @@ class VLMClient:
             Dict: {"type": "action", "content": dict} for final parsed action
         """
         try:
-            response = requests.post(
+            payload = {
+                "model": self.model_name,
+                "messages": messages,
+                "stream": True,
+                "think": True,
+                "options": self.model_params
+            }
+            response = self.http_session.post(
                 f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model_name,
-                    "messages": messages,
-                    "stream": True,
-                    "think": True,
-                    "options": self.model_params
-                },
+                data=_json_dumps(payload),
+                headers={"Content-Type": "application/json"},
                 stream=True
             )
             
             full_response = ""
             full_thinking = ""
             
-            for line in response.iter_lines():
+            # chunk_size=None hands over each HTTP chunk as it arrives instead of
+            # re-slicing it into 512-byte reads; lines stay undecoded bytes for the parser
+            for line in response.iter_lines(chunk_size=None):
                 if line:
-                    data = json.loads(line.decode('utf-8'))
+                    data = _json_loads(line)
                     msg = data.get("message", {})
                     
                     # 1. Handle "thinking" field (Qwen/DeepSeek reasoning models)
@@ -131,13 +167,15 @@ class VLMClient:
                     if data.get("done"):
                         break
             
-            print(f"\n[DEBUG] Full Thinking:\n{full_thinking}\n")
-            print(f"[DEBUG] Full Model Response (No Thinking):\n{full_response}\n[DEBUG] End Response\n")
+            if DEBUG_VLM:
+                print(f"\n[DEBUG] Full Thinking:\n{full_thinking}\n")
+                print(f"[DEBUG] Full Model Response (No Thinking):\n{full_response}\n[DEBUG] End Response\n")
 
             # Parse the final complete response
             action = self._parse_action(full_response)
             if not action and full_thinking:
-                print("[DEBUG] Content empty or no action, trying to parse from Thinking...")
+                if DEBUG_VLM:
+                    print("[DEBUG] Content empty or no action, trying to parse from Thinking...")
                 # Fallback: sometimes models put the tool call inside the thought process or mixed
                 action = self._parse_action(full_thinking + "\n" + full_response)
             
@@ -152,12 +190,11 @@ class VLMClient:
             print(f"VLM Error: {e}")
             yield {"type": "error", "content": str(e)}
 
-    def _extract_json_candidates(self, text: str) -> List[str]:
+    def _extract_json_candidates(self, text: str) -> Iterator[str]:
         """
-        Extracts all top-level text blocks wrapped in {} that might be JSON.
+        Lazily yields top-level text blocks wrapped in {} that might be JSON.
         Handles nested braces and strings to avoid false positives.
         """
-        candidates = []
         brace_level = 0
         start_index = -1
         in_string = False
@@ -185,30 +222,26 @@ class VLMClient:
                 if brace_level > 0:
                     brace_level -= 1
                     if brace_level == 0:
-                        candidates.append(text[start_index:i+1])
-                        
-        return candidates
+                        yield text[start_index:i+1]
 
     def _parse_action(self, response_text: str) -> Dict[str, Any]:
         """
         Robustly extracts the JSON action from <tool_call> tags or raw text.
         """
         # 1. Try to find <tool_call> tags
-        pattern = r"<tool_call>\s*(.*?)\s*</tool_call>"
-        match = re.search(pattern, response_text, re.DOTALL)
+        match = _TOOL_CALL_RE.search(response_text)
         
-        candidates = []
+        # 2. Fall back to top-level JSON-like objects from the full text. The scan is
+        # lazy, so it only runs when the <tool_call> block is missing or invalid.
+        candidates = self._extract_json_candidates(response_text)
         if match:
-            candidates.append(match.group(1))
-        
-        # 2. Extract all top-level JSON-like objects from the full text
-        candidates.extend(self._extract_json_candidates(response_text))
+            candidates = chain((match.group(1),), candidates)
         
         for json_str in candidates:
-            json_str = json_str.replace("“", '"').replace("”", '"')
+            json_str = json_str.translate(_SMART_QUOTES)
             
             try:
-                data = json.loads(json_str)
+                data = _json_loads(json_str)
                 if isinstance(data, dict):
                     if "name" in data and "arguments" in data:
                         return data["arguments"]
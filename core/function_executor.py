@@ -3,14 +3,67 @@ Function Executor - Executes Gemma-routed functions with actual backend calls.
 """
 
 import asyncio
+import concurrent.futures
+import re
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, field
 import threading
 import time
+from contextlib import ExitStack
 
+# uvloop is a faster drop-in event loop (not available on Windows)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
-@dataclass
+# A number with an optional unit ("10 minutes", "1 hour", "30 seconds", "5")
+_DURATION_RE = re.compile(
+    r'(?P<num>\d+)\s*(?P<unit>h(?:our)?s?|m(?:in(?:ute)?s?)?|s(?:ec(?:ond)?s?)?)?'
+)
+# Seconds per unit, keyed by the unit's first letter
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1}
+# Times like "7am", "7:30am", "14:30"
+_TIME_RE = re.compile(r'(\d{1,2}):?(\d{2})?\s*(am|pm)?')
+
+# Upper bound on a single call through the background loop (Kasa discovery, backend fetches)
+ASYNC_CALL_TIMEOUT = 30
+
+# Seconds to reuse a weather fetch in get_system_info
+WEATHER_CACHE_TTL = 60
+
+# Sentinel for managers that haven't been created yet (None means init failed)
+_UNSET = object()
+
+
+def _create_task_manager():
+    from core.tasks import TaskManager
+    return TaskManager()
+
+
+def _create_calendar_manager():
+    from core.calendar_manager import CalendarManager
+    return CalendarManager()
+
+
+def _get_kasa_manager():
+    from core.kasa_control import kasa_manager
+    return kasa_manager
+
+
+def _create_weather_manager():
+    from core.weather import WeatherManager
+    return WeatherManager()
+
+
+def _create_news_manager():
+    from core.news import NewsManager
+    return NewsManager()
+
+
+@dataclass(slots=True)
 class ActiveTimer:
     """Represents an active countdown timer."""
     label: str
@@ -41,50 +94,130 @@ class FunctionExecutor:
     """Central executor for all Gemma-routed functions."""
     
     def __init__(self):
-        self.task_manager = None
-        self.calendar_manager = None
-        self.kasa_manager = None
-        self.weather_manager = None
-        self.news_manager = None
-        
-        # In-memory timer storage
+        # Backend managers are created on first use (see the properties below)
+        self._task_manager = _UNSET
+        self._calendar_manager = _UNSET
+        self._kasa_manager = _UNSET
+        self._weather_manager = _UNSET
+        self._news_manager = _UNSET
+        self._managers_lock = threading.Lock()
+        
+        # In-memory timer storage. Copy-on-write: writers build a new dict and
+        # swap it in, so readers (status polling) iterate a snapshot without locking.
+        # The lock only serializes writers against each other.
         self.active_timers: Dict[str, ActiveTimer] = {}
         self._timer_lock = threading.Lock()
         
-        # Lazy load managers
-        self._init_managers()
+        # DuckDuckGo client, created on the first web search and reused
+        self._ddgs = None
+        self._ddgs_stack = None  # Exits the DDGS context when the client is dropped
+        self._ddgs_lock = threading.Lock()
+        
+        # Last weather summary for get_system_info: (monotonic fetched_at, data)
+        self._weather_cache = (0.0, None)
+        
+        # Persistent event loop for async backends (Kasa), reused across calls
+        self._loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+        if hasattr(asyncio, "eager_task_factory"):
+            # Python 3.12+: coroutines that finish without suspending skip the scheduler
+            self._loop.set_task_factory(asyncio.eager_task_factory)
+        self._loop_thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="FunctionExecutor-loop",
+            daemon=True
+        )
+        self._loop_thread.start()
+        
+        # Function name -> handler (all handlers take the params dict)
+        self._dispatch = {
+            "control_light": self._control_light,
+            "set_timer": self._set_timer,
+            "set_alarm": self._set_alarm,
+            "create_calendar_event": self._create_calendar_event,
+            "add_task": self._add_task,
+            "web_search": self._web_search,
+            "get_system_info": lambda params: self._get_system_info(),
+        }
     
-    def _init_managers(self):
-        """Initialize manager references."""
-        try:
-            from core.tasks import TaskManager
-            self.task_manager = TaskManager()
-        except Exception as e:
-            print(f"[FunctionExecutor] TaskManager init failed: {e}")
-        
-        try:
-            from core.calendar_manager import CalendarManager
-            self.calendar_manager = CalendarManager()
-        except Exception as e:
-            print(f"[FunctionExecutor] CalendarManager init failed: {e}")
-        
-        try:
-            from core.kasa_control import kasa_manager
-            self.kasa_manager = kasa_manager
-        except Exception as e:
-            print(f"[FunctionExecutor] KasaManager init failed: {e}")
-        
-        try:
-            from core.weather import WeatherManager
-            self.weather_manager = WeatherManager()
-        except Exception as e:
-            print(f"[FunctionExecutor] WeatherManager init failed: {e}")
-        
+    def _get_manager(self, attr: str, name: str, factory):
+        """Return a manager, creating it on first access. Failed inits are cached as None."""
+        manager = getattr(self, attr)
+        if manager is _UNSET:
+            with self._managers_lock:
+                manager = getattr(self, attr)
+                if manager is _UNSET:
+                    try:
+                        manager = factory()
+                    except Exception as e:
+                        print(f"[FunctionExecutor] {name} init failed: {e}")
+                        manager = None
+                    setattr(self, attr, manager)
+        return manager
+    
+    @property
+    def task_manager(self):
+        return self._get_manager("_task_manager", "TaskManager", _create_task_manager)
+    
+    @task_manager.setter
+    def task_manager(self, value):
+        self._task_manager = value
+    
+    @property
+    def calendar_manager(self):
+        return self._get_manager("_calendar_manager", "CalendarManager", _create_calendar_manager)
+    
+    @calendar_manager.setter
+    def calendar_manager(self, value):
+        self._calendar_manager = value
+    
+    @property
+    def kasa_manager(self):
+        return self._get_manager("_kasa_manager", "KasaManager", _get_kasa_manager)
+    
+    @kasa_manager.setter
+    def kasa_manager(self, value):
+        self._kasa_manager = value
+    
+    @property
+    def weather_manager(self):
+        return self._get_manager("_weather_manager", "WeatherManager", _create_weather_manager)
+    
+    @weather_manager.setter
+    def weather_manager(self, value):
+        self._weather_manager = value
+    
+    @property
+    def news_manager(self):
+        return self._get_manager("_news_manager", "NewsManager", _create_news_manager)
+    
+    @news_manager.setter
+    def news_manager(self, value):
+        self._news_manager = value
+    
+    def _run_async(self, coro, timeout: float = ASYNC_CALL_TIMEOUT):
+        """
+        Run a coroutine on the background loop and block until it completes.
+        Raises TimeoutError if it takes longer than `timeout` seconds. After
+        shutdown() the coroutine runs on a throwaway loop instead.
+        """
+        if self._loop.is_closed():
+            return asyncio.run(asyncio.wait_for(coro, timeout))
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
         try:
-            from core.news import NewsManager
-            self.news_manager = NewsManager()
-        except Exception as e:
-            print(f"[FunctionExecutor] NewsManager init failed: {e}")
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Async call timed out after {timeout}s")
+    
+    def shutdown(self):
+        """Close the search client, then stop the background event loop, wait for its thread and close it."""
+        with self._ddgs_lock:
+            self._close_ddgs()
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
     
     def execute(self, func_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -98,22 +231,10 @@ class FunctionExecutor:
             }
         """
         try:
-            if func_name == "control_light":
-                return self._control_light(params)
-            elif func_name == "set_timer":
-                return self._set_timer(params)
-            elif func_name == "set_alarm":
-                return self._set_alarm(params)
-            elif func_name == "create_calendar_event":
-                return self._create_calendar_event(params)
-            elif func_name == "add_task":
-                return self._add_task(params)
-            elif func_name == "web_search":
-                return self._web_search(params)
-            elif func_name == "get_system_info":
-                return self._get_system_info()
-            else:
+            handler = self._dispatch.get(func_name)
+            if handler is None:
                 return {"success": False, "message": f"Unknown function: {func_name}", "data": None}
+            return handler(params)
         except Exception as e:
             return {"success": False, "message": f"Error: {str(e)}", "data": None}
     
@@ -122,7 +243,7 @@ class FunctionExecutor:
     def _control_light(self, params: Dict) -> Dict:
         """Control smart lights via Kasa. Wrapper for async execution."""
         try:
-            return asyncio.run(self._async_control_light(params))
+            return self._run_async(self._async_control_light(params))
         except Exception as e:
             print(f"[FunctionExecutor] Light control failed: {e}")
             return {"success": False, "message": f"Light control failed: {e}", "data": None}
@@ -230,16 +351,15 @@ class FunctionExecutor:
                 
             elif action == "toggle":
                 # We need to know current state. 
-                # Since we can't trust cached state from closed loop, we must check.
-                # Just blindly turning off or on is risky. 
-                # Let's try to get state first.
+                # Cached state may be stale, so read it from the device first,
+                # then reuse that connection for the switch (same loop, no rediscovery).
                 dev, _ = await self.kasa_manager._get_light_module(ip)
                 if dev:
                     if dev.is_on:
-                        success = await self.kasa_manager.turn_off(ip)
+                        success = await self.kasa_manager.turn_off(ip, dev=dev)
                         action_desc = "Turned off"
                     else:
-                        success = await self.kasa_manager.turn_on(ip)
+                        success = await self.kasa_manager.turn_on(ip, dev=dev)
                         action_desc = "Turned on"
                 else:
                     success = False
@@ -262,11 +382,26 @@ class FunctionExecutor:
     
     def _set_timer(self, params: Dict) -> Dict:
         """Set a countdown timer."""
-        duration_str = params.get("duration", "")
+        duration = params.get("duration", "")
         label = params.get("label", "Timer")
         
-        # Parse duration string
-        seconds = self._parse_duration(duration_str)
+        # Fast path: numeric values skip the string parser. The router already
+        # converts digit-only args to int (e.g. duration:5 -> 5). bool is an int
+        # subclass, so it is excluded explicitly.
+        seconds = params.get("seconds")
+        if isinstance(seconds, (int, float)) and not isinstance(seconds, bool):
+            seconds = int(seconds)
+            duration_str = f"{seconds} seconds"
+        elif isinstance(duration, (int, float)) and not isinstance(duration, bool):
+            # Bare number means minutes, same as a unitless duration string
+            seconds = int(duration * 60)
+            duration_str = f"{duration} minutes"
+        elif isinstance(duration, str):
+            duration_str = duration
+            seconds = self._parse_duration(duration_str)
+        else:
+            duration_str = str(duration)
+            seconds = 0
         if seconds <= 0:
             return {"success": False, "message": f"Invalid duration: {duration_str}", "data": None}
         
@@ -277,7 +412,10 @@ class FunctionExecutor:
         )
         
         with self._timer_lock:
-            self.active_timers[label] = timer
+            # Drop expired timers while copying
+            timers = {k: t for k, t in self.active_timers.items() if not t.is_expired}
+            timers[label] = timer
+            self.active_timers = timers
         
         return {
             "success": True,
@@ -285,29 +423,33 @@ class FunctionExecutor:
             "data": {"label": label, "duration": duration_str, "seconds": seconds}
         }
     
+    def _prune_timers(self):
+        """Publish a new timer snapshot without the expired entries."""
+        with self._timer_lock:
+            self.active_timers = {k: t for k, t in self.active_timers.items() if not t.is_expired}
+    
     def _parse_duration(self, duration_str: str) -> int:
         """Parse duration string like '10 minutes' or '1 hour 30 minutes' to seconds."""
         duration_str = duration_str.lower().strip()
         total_seconds = 0
-        
-        import re
-        # Match patterns like "10 minutes", "1 hour", "30 seconds"
-        patterns = [
-            (r'(\d+)\s*h(?:our)?s?', 3600),
-            (r'(\d+)\s*m(?:in(?:ute)?s?)?', 60),
-            (r'(\d+)\s*s(?:ec(?:ond)?s?)?', 1),
-        ]
-        
-        for pattern, multiplier in patterns:
-            match = re.search(pattern, duration_str)
-            if match:
-                total_seconds += int(match.group(1)) * multiplier
-        
-        # If no pattern matched, try to extract just a number (assume minutes)
-        if total_seconds == 0:
-            nums = re.findall(r'\d+', duration_str)
-            if nums:
-                total_seconds = int(nums[0]) * 60  # Default to minutes
+        first_bare_number = None
+        seen_units = set()
+        
+        # Single pass over patterns like "10 minutes", "1 hour", "30 seconds".
+        # Only the first amount per unit counts ("5 minutes or 10 minutes" is 5 minutes).
+        for match in _DURATION_RE.finditer(duration_str):
+            unit = match.group("unit")
+            if unit:
+                unit = unit[0]
+                if unit not in seen_units:
+                    seen_units.add(unit)
+                    total_seconds += int(match.group("num")) * _DURATION_UNITS[unit]
+            elif first_bare_number is None:
+                first_bare_number = int(match.group("num"))
+        
+        # If no unit matched, use the first plain number (assume minutes)
+        if total_seconds == 0 and first_bare_number is not None:
+            total_seconds = first_bare_number * 60  # Default to minutes
         
         return total_seconds
     
@@ -336,9 +478,8 @@ class FunctionExecutor:
         """Normalize time string to HH:MM format."""
         time_str = time_str.lower().strip()
         
-        import re
         # Match patterns like "7am", "7:30am", "14:30"
-        match = re.match(r'(\d{1,2}):?(\d{2})?\s*(am|pm)?', time_str)
+        match = _TIME_RE.match(time_str)
         if match:
             hour = int(match.group(1))
             minute = int(match.group(2)) if match.group(2) else 0
@@ -451,24 +592,20 @@ class FunctionExecutor:
             return {"success": False, "message": "No search query provided", "data": None}
         
         try:
-            from duckduckgo_search import DDGS
-            
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=5))
+            # Only the top 3 are shown, so only ask DDGS for 3
+            formatted = [
+                {
+                    "title": r.get("title", ""),
+                    "body": (r.get("body") or "")[:200],
+                    "url": r.get("href", "")
+                }
+                for r in self._ddgs_text(query, max_results=3)
+            ]
             
-            if results:
-                # Format results for display
-                formatted = []
-                for r in results[:3]:
-                    formatted.append({
-                        "title": r.get("title", ""),
-                        "body": r.get("body", "")[:200],
-                        "url": r.get("href", "")
-                    })
-                
+            if formatted:
                 return {
                     "success": True,
-                    "message": f"Found {len(results)} results for '{query}'",
+                    "message": f"Found {len(formatted)} results for '{query}'",
                     "data": {"query": query, "results": formatted}
                 }
             
@@ -477,12 +614,40 @@ class FunctionExecutor:
         except Exception as e:
             return {"success": False, "message": f"Search failed: {e}", "data": None}
     
+    def _ddgs_text(self, query: str, max_results: int) -> list:
+        """
+        Run a text search on the shared DDGS client, creating it on first use.
+        The lock serializes searches on the shared client; on error the client
+        is closed and dropped so the next search starts a fresh session.
+        """
+        with self._ddgs_lock:
+            if self._ddgs is None:
+                from duckduckgo_search import DDGS
+                self._ddgs_stack = ExitStack()
+                self._ddgs = self._ddgs_stack.enter_context(DDGS())
+            try:
+                return list(self._ddgs.text(query, max_results=max_results))
+            except Exception:
+                self._close_ddgs()
+                raise
+    
+    def _close_ddgs(self):
+        """Close and drop the shared DDGS client. Caller holds _ddgs_lock."""
+        if self._ddgs_stack is not None:
+            try:
+                self._ddgs_stack.close()
+            except Exception as e:
+                print(f"[FunctionExecutor] DDGS close failed: {e}")
+        self._ddgs = None
+        self._ddgs_stack = None
+    
     # === System Info ===
     
     def _get_system_info(self) -> Dict:
         """Aggregate all system information."""
+        now = datetime.now()
         info = {
-            "current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "current_time": f"{now:%Y-%m-%d %H:%M:%S}",
             "timers": [],
             "alarms": [],
             "calendar_today": [],
@@ -492,73 +657,123 @@ class FunctionExecutor:
             "news": []
         }
         
-        # Active timers
-        with self._timer_lock:
-            for label, timer in list(self.active_timers.items()):
-                if timer.is_expired:
-                    del self.active_timers[label]
-                else:
-                    info["timers"].append({
-                        "label": timer.label,
-                        "remaining": timer.format_remaining()
-                    })
+        # Active timers (lock-free read of the current snapshot)
+        timers = self.active_timers
+        expired = False
+        for timer in timers.values():
+            if timer.is_expired:
+                expired = True
+            else:
+                info["timers"].append({
+                    "label": timer.label,
+                    "remaining": timer.format_remaining()
+                })
+        if expired:
+            self._prune_timers()
+        
+        # Smart devices
+        if self.kasa_manager and self.kasa_manager.devices:
+            for ip, device in self.kasa_manager.devices.items():
+                info["smart_devices"].append({
+                    "name": device.get("alias", "Unknown"),
+                    "is_on": device.get("is_on", False),
+                    "type": device.get("type", "Unknown")
+                })
         
-        # Alarms
+        # Alarms, calendar, tasks, weather and news are blocking DB/HTTP calls;
+        # fetch them concurrently so the total wait is the slowest one
+        try:
+            alarms, events, tasks, weather, news = self._run_async(
+                self._async_fetch_backends(f"{now:%Y-%m-%d}")
+            )
+        except Exception as e:
+            print(f"[FunctionExecutor] Backend fetch failed: {e}")
+            alarms = events = tasks = weather = news = None
+        if alarms is not None:
+            info["alarms"] = alarms
+        if events is not None:
+            info["calendar_today"] = events
+        if tasks is not None:
+            info["tasks"] = tasks
+        info["weather"] = weather
+        if news is not None:
+            info["news"] = news
+        
+        return {
+            "success": True,
+            "message": "System info retrieved",
+            "data": info
+        }
+    
+    async def _async_fetch_backends(self, today: str):
+        """Run the blocking system-info fetchers in the default thread pool."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            loop.run_in_executor(None, self._fetch_alarms),
+            loop.run_in_executor(None, self._fetch_calendar_today, today),
+            loop.run_in_executor(None, self._fetch_tasks),
+            loop.run_in_executor(None, self._fetch_weather),
+            loop.run_in_executor(None, self._fetch_news),
+        )
+    
+    def _fetch_alarms(self):
         if self.task_manager:
             try:
                 alarms = self.task_manager.get_alarms()
-                info["alarms"] = [{"time": a["time"], "label": a["label"]} for a in alarms]
+                return [{"time": a["time"], "label": a["label"]} for a in alarms]
             except:
                 pass
-        
-        # Calendar events today
+        return None
+    
+    def _fetch_calendar_today(self, today: str):
         if self.calendar_manager:
             try:
-                today = datetime.now().strftime("%Y-%m-%d")
                 events = self.calendar_manager.get_events(today)
-                info["calendar_today"] = [{"title": e["title"], "time": e["start_time"]} for e in events]
+                return [{"title": e["title"], "time": e["start_time"]} for e in events]
             except:
                 pass
-        
-        # Tasks
+        return None
+    
+    def _fetch_tasks(self):
         if self.task_manager:
             try:
                 tasks = self.task_manager.get_tasks()
-                info["tasks"] = [{"text": t["text"], "completed": t["completed"]} for t in tasks]
+                return [{"text": t["text"], "completed": t["completed"]} for t in tasks]
             except:
                 pass
+        return None
+    
+    def _fetch_weather(self):
+        # Weather is a remote API call; reuse the last result for a minute
+        now = time.monotonic()
+        fetched_at, cached = self._weather_cache
+        if cached is not None and now - fetched_at < WEATHER_CACHE_TTL:
+            return dict(cached)  # Copy so callers can't mutate the cached summary
         
-        # Smart devices
-        if self.kasa_manager and self.kasa_manager.devices:
-            for ip, device in self.kasa_manager.devices.items():
-                info["smart_devices"].append({
-                    "name": device.get("alias", "Unknown"),
-                    "is_on": device.get("is_on", False),
-                    "type": device.get("type", "Unknown")
-                })
-        
-        # Weather
         if self.weather_manager:
             try:
                 weather = self.weather_manager.get_weather()
                 if weather and "current" in weather:
                     current = weather["current"]
-                    info["weather"] = {
+                    summary = {
                         "temp": current.get("temp"),
                         "condition": current.get("condition"),
                         "high": weather.get("daily", {}).get("high"),
                         "low": weather.get("daily", {}).get("low")
                     }
+                    self._weather_cache = (now, summary)
+                    return dict(summary)
             except:
                 pass
-        
-        # News
+        return None
+    
+    def _fetch_news(self):
         if self.news_manager:
             try:
                 # Get recent news (cached or fresh)
                 news_items = self.news_manager.get_briefing(use_ai=False)
                 # Limit to top 5 for system info
-                info["news"] = [
+                return [
                     {
                         "title": item.get("title", ""),
                         "category": item.get("category", "News"),
@@ -568,14 +783,7 @@ class FunctionExecutor:
                 ]
             except Exception as e:
                 print(f"[FunctionExecutor] News fetch error: {e}")
-                pass
-        
-        return {
-            "success": True,
-            "message": "System info retrieved",
-            "data": info
-        }
-
+        return None
 
 # Global instance
 executor = FunctionExecutor()
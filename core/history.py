@@ -2,23 +2,32 @@ import sqlite3
 import json
 import uuid
 import datetime
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 DB_PATH = "chat_history.db"
+SCHEMA_VERSION = 1  # Bump when adding a migration to _init_db
 
 class ChatHistoryManager:
     def __init__(self, db_path: str = "data/chat_history.db"):
         self.db_path = db_path
         # Ensure directory exists
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._conn = None
         self._init_db()
 
     def _init_db(self):
-        """Initialize the database schema."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
-            
+        """Open the shared connection and initialize the database schema."""
+        # One connection for the lifetime of the manager; autocommit mode, with
+        # explicit transactions where several statements must apply together
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+
+        with self._transaction() as cursor:
             # Sessions table
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS sessions (
@@ -29,13 +38,18 @@ class ChatHistoryManager:
                 pinned INTEGER DEFAULT 0
             )
             ''')
-            
-            # Add pinned column if it doesn't exist (migration for existing DBs)
-            try:
-                cursor.execute('ALTER TABLE sessions ADD COLUMN pinned INTEGER DEFAULT 0')
-            except sqlite3.OperationalError:
-                pass  # Column already exists
-            
+
+            # One-time migrations, tracked via PRAGMA user_version
+            version = cursor.execute('PRAGMA user_version').fetchone()[0]
+            if version < 1:
+                # Add pinned column if it doesn't exist (migration for existing DBs)
+                try:
+                    cursor.execute('ALTER TABLE sessions ADD COLUMN pinned INTEGER DEFAULT 0')
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
+            if version < SCHEMA_VERSION:
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
             # Messages table
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS messages (
@@ -47,67 +61,71 @@ class ChatHistoryManager:
                 FOREIGN KEY(session_id) REFERENCES sessions(id)
             )
             ''')
-            
-            conn.commit()
-        finally:
-            conn.close()
+
+            # Indexes matching the get_messages / get_sessions orderings
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_msg_session_id ON messages(session_id, id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_sess_pinned_updated ON sessions(pinned DESC, updated_at DESC)')
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the connection lock and run the enclosed statements as one transaction."""
+        with self._db_lock:
+            cursor = self._conn.cursor()
+            cursor.execute('BEGIN')
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+            else:
+                cursor.execute('COMMIT')
+
+    def close(self):
+        """Close the shared connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
     def create_session(self, title="New Chat"):
         """Create a new chat session."""
         session_id = str(uuid.uuid4())
         now = datetime.datetime.now().isoformat()
-        
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
+
+        with self._db_lock:
+            self._conn.execute(
                 'INSERT INTO sessions (id, title, created_at, updated_at, pinned) VALUES (?, ?, ?, ?, ?)',
                 (session_id, title, now, now, 0)
             )
-            conn.commit()
-        finally:
-            conn.close()
         return session_id
 
     def update_session_title(self, session_id, title):
         """Update the title of a session."""
         now = datetime.datetime.now().isoformat()
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
+        with self._db_lock:
+            self._conn.execute(
                 'UPDATE sessions SET title = ?, updated_at = ? WHERE id = ?',
                 (title, now, session_id)
             )
-            conn.commit()
-        finally:
-            conn.close()
 
     def toggle_pin(self, session_id):
         """Toggle the pinned status of a session. Returns the new pinned state."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
-            
+        with self._transaction() as cursor:
             # Get current pinned state
             cursor.execute('SELECT pinned FROM sessions WHERE id = ?', (session_id,))
             row = cursor.fetchone()
             current_pinned = row[0] if row else 0
             new_pinned = 0 if current_pinned else 1
-            
+
             # Update
             cursor.execute('UPDATE sessions SET pinned = ? WHERE id = ?', (new_pinned, session_id))
-            conn.commit()
-            return bool(new_pinned)
-        finally:
-            conn.close()
+        return bool(new_pinned)
 
     def add_message(self, session_id, role, content):
         """Add a message to a session."""
         now = datetime.datetime.now().isoformat()
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
+        # Insert and timestamp bump share one transaction (one commit, one WAL sync)
+        with self._transaction() as cursor:
             cursor.execute(
                 'INSERT INTO messages (session_id, role, content, timestamp) VALUES (?, ?, ?, ?)',
                 (session_id, role, content, now)
@@ -117,51 +135,35 @@ class ChatHistoryManager:
                 'UPDATE sessions SET updated_at = ? WHERE id = ?',
                 (now, session_id)
             )
-            conn.commit()
-        finally:
-            conn.close()
 
     def get_sessions(self):
         """Get all sessions, ordered by pinned first, then most recent update."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
-            cursor.execute('SELECT id, title, created_at, pinned FROM sessions ORDER BY pinned DESC, updated_at DESC')
-            sessions = [
-                {'id': row[0], 'title': row[1], 'created_at': row[2], 'pinned': bool(row[3])}
-                for row in cursor.fetchall()
-            ]
-            return sessions
-        finally:
-            conn.close()
+        with self._db_lock:
+            rows = self._conn.execute(
+                'SELECT id, title, created_at, pinned FROM sessions ORDER BY pinned DESC, updated_at DESC'
+            ).fetchall()
+        return [
+            {'id': row[0], 'title': row[1], 'created_at': row[2], 'pinned': bool(row[3])}
+            for row in rows
+        ]
 
     def get_messages(self, session_id):
         """Get all messages for a session."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
+        with self._db_lock:
+            rows = self._conn.execute(
                 'SELECT role, content FROM messages WHERE session_id = ? ORDER BY id ASC',
                 (session_id,)
-            )
-            messages = [
-                {'role': row[0], 'content': row[1]}
-                for row in cursor.fetchall()
-            ]
-            return messages
-        finally:
-            conn.close()
+            ).fetchall()
+        return [
+            {'role': row[0], 'content': row[1]}
+            for row in rows
+        ]
 
     def delete_session(self, session_id):
         """Delete a session and all its messages."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cursor = conn.cursor()
+        with self._transaction() as cursor:
             cursor.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
             cursor.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
-            conn.commit()
-        finally:
-            conn.close()
 
 # Global Instance
 history_manager = ChatHistoryManager()
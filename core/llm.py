@@ -129,19 +129,25 @@ def preload_models():
 
     def load_voice():
         print(f"{GRAY}[System] Loading voice model...{RESET}")
-        tts.initialize()
+        if tts.initialize():
+            print(f"{GRAY}[System] Voice model ready.{RESET}")
 
     # Create threads
     threads.append(threading.Thread(target=load_router))
     threads.append(threading.Thread(target=load_responder))
-    threads.append(threading.Thread(target=load_voice))
 
     # Start all
     for t in threads:
         t.start()
     
-    # Wait for all
+    # Voice finishes in the background; tts.ready is set when it's done
+    threading.Thread(target=load_voice, daemon=True).start()
+    
+    # Wait for router and responder only
     for t in threads:
         t.join()
 
-    print(f"{GRAY}[System] Models warm and ready.{RESET}")
+    if tts.ready.is_set():
+        print(f"{GRAY}[System] Models warm and ready.{RESET}")
+    else:
+        print(f"{GRAY}[System] Router and responder ready (voice still loading).{RESET}")
@@ -2,10 +2,23 @@
 Model Manager - Utilities for loading/unloading Ollama models.
 """
 
+import time
 import requests
-import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 from config import OLLAMA_URL, GRAY, RESET
 
+# Persistent Session so /ps and unload calls reuse keep-alive connections to Ollama
+http_session = requests.Session()
+http_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Small shared pool for unload requests (bounded fan-out against the Ollama server)
+_unload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ollama-unload")
+
+# Short-lived /ps result so bursts of get_running_models() share one request
+_PS_TTL = 0.5  # seconds
+_ps_cache = {"t": 0.0, "v": []}
+
 
 def sync_unload_model(model_name: str):
     """
@@ -13,7 +26,7 @@ def sync_unload_model(model_name: str):
     """
     try:
         # Send a request with keep_alive=0 to unload
-        response = requests.post(
+        response = http_session.post(
             f"{OLLAMA_URL}/generate",
             json={
                 "model": model_name,
@@ -23,6 +36,7 @@ def sync_unload_model(model_name: str):
             timeout=5
         )
         if response.status_code == 200:
+            _ps_cache["t"] = 0.0  # Running set changed
             print(f"{GRAY}[ModelManager] Unloaded model: {model_name}{RESET}")
         else:
             print(f"{GRAY}[ModelManager] Failed to unload {model_name}: {response.status_code}{RESET}")
@@ -34,36 +48,44 @@ def unload_model(model_name: str):
     """
     Unload a model from Ollama to free up VRAM.
     Uses keep_alive=0 to immediately unload.
+    Returns the Future for the background request.
     """
     # Run in background to not block UI
-    threading.Thread(target=sync_unload_model, args=(model_name,), daemon=True).start()
+    return _unload_executor.submit(sync_unload_model, model_name)
 
 
 def unload_all_models(sync: bool = False):
     """Unload all running models in Ollama."""
     try:
-        response = requests.get(f"{OLLAMA_URL}/ps", timeout=2)
+        response = http_session.get(f"{OLLAMA_URL}/ps", timeout=2)
         if response.status_code == 200:
             data = response.json()
             models = data.get("models", [])
-            for model in models:
-                model_name = model.get("name", "")
-                if model_name:
-                    if sync:
-                        sync_unload_model(model_name)
-                    else:
-                        unload_model(model_name)
+            # Unload in parallel; wait for all of them only when sync is requested
+            futures = [
+                unload_model(model_name)
+                for model_name in (model.get("name", "") for model in models)
+                if model_name
+            ]
+            if sync and futures:
+                wait(futures)
     except Exception as e:
         print(f"{GRAY}[ModelManager] Error getting running models: {e}{RESET}")
 
 
 def get_running_models() -> list:
     """Get list of currently running model names."""
+    now = time.monotonic()
+    if now - _ps_cache["t"] < _PS_TTL:
+        return list(_ps_cache["v"])
     try:
-        response = requests.get(f"{OLLAMA_URL}/ps", timeout=2)
+        response = http_session.get(f"{OLLAMA_URL}/ps", timeout=2)
         if response.status_code == 200:
             data = response.json()
-            return [m.get("name", "") for m in data.get("models", [])]
+            models = [m.get("name", "") for m in data.get("models", [])]
+            _ps_cache["v"] = models
+            _ps_cache["t"] = time.monotonic()
+            return list(models)
     except:
         pass
     return []
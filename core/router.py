@@ -19,10 +19,25 @@ import re
 import json
 from huggingface_hub import snapshot_download
 
+# bitsandbytes weight quantization (optional, CUDA only)
+try:
+    import bitsandbytes  # noqa: F401
+    from transformers import BitsAndBytesConfig
+    BNB_AVAILABLE = True
+except ImportError:
+    BNB_AVAILABLE = False
+
+# FlashAttention-2 kernels (optional, CUDA only)
+try:
+    import flash_attn  # noqa: F401
+    FLASH_ATTN_AVAILABLE = True
+except ImportError:
+    FLASH_ATTN_AVAILABLE = False
+
 # Suppress transformers logging
 transformers_logging.set_verbosity_error()
 
-from config import LOCAL_ROUTER_PATH, HF_ROUTER_REPO
+from config import LOCAL_ROUTER_PATH, HF_ROUTER_REPO, ROUTER_QUANTIZATION
 
 # Debug flag - set to True to see Gemma's raw response
 DEBUG_ROUTER = False
@@ -166,6 +181,15 @@ VALID_FUNCTIONS = {
     "add_task", "web_search", "get_system_info", "thinking", "nonthinking"
 }
 
+# Matches the first "call:<function_name>" in a response
+_CALL_RE = re.compile(r"call:(" + "|".join(re.escape(n) for n in sorted(VALID_FUNCTIONS)) + r")\b")
+# Argument block per function: call:name{...}
+_ARG_BLOCK_RES = {
+    name: re.compile(rf"call:{re.escape(name)}\{{([^}}]+)\}}") for name in VALID_FUNCTIONS
+}
+# key:<escape>value<escape> OR key:value (for ints/bools)
+_ARG_RE = re.compile(r'(\w+):(?:<escape>([^<]*)<escape>|([^,]+))')
+
 
 def ensure_model_available(model_path: str = LOCAL_ROUTER_PATH) -> str:
     """
@@ -199,10 +223,17 @@ def ensure_model_available(model_path: str = LOCAL_ROUTER_PATH) -> str:
         )
 
 
+def _is_attention_error(error: Exception) -> bool:
+    """True if a from_pretrained error is about the requested attention implementation."""
+    message = str(error).lower()
+    return any(key in message for key in ("attention", "attn", "sdpa", "flash"))
+
+
 class FunctionGemmaRouter:
     """Routes user prompts to appropriate functions using fine-tuned FunctionGemma."""
     
-    def __init__(self, model_path: str = LOCAL_ROUTER_PATH, compile_model: bool = False):
+    def __init__(self, model_path: str = LOCAL_ROUTER_PATH, compile_model: bool = False,
+                 quantization: str = ROUTER_QUANTIZATION):
         # Ensure model is available (download from HF if needed)
         model_path = ensure_model_available(model_path)
         
@@ -215,24 +246,74 @@ class FunctionGemmaRouter:
         # CPU often doesn't support bfloat16 natively
         dtype = torch.bfloat16 if device == "cuda" else torch.float32
         
-        self.model = AutoModelForCausalLM.from_pretrained(
-            model_path,
-            torch_dtype=dtype,
-            device_map=device,
-        )
+        # Optional int8/int4 weights: less memory traffic per decode step and less VRAM
+        quant_config = None
+        if quantization:
+            if device != "cuda":
+                print(f"Quantization '{quantization}' skipped: requires CUDA")
+            elif not BNB_AVAILABLE:
+                print(f"Quantization '{quantization}' skipped: bitsandbytes not installed")
+            elif quantization == "8bit":
+                # Default llm_int8_threshold keeps outlier features in fp16
+                quant_config = BitsAndBytesConfig(load_in_8bit=True)
+            elif quantization == "4bit":
+                quant_config = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_compute_dtype=torch.bfloat16,
+                )
+            else:
+                print(f"Unknown quantization '{quantization}', loading full precision")
+        
+        # Prefer fused attention kernels; fall back if the model/env rejects one
+        attn_candidates = ["sdpa", "eager"]
+        # FlashAttention-2 needs Ampere (sm_80) or newer; older GPUs only fail at generate()
+        if device == "cuda" and FLASH_ATTN_AVAILABLE and torch.cuda.get_device_capability()[0] >= 8:
+            attn_candidates.insert(0, "flash_attention_2")
+        
+        for attn_impl in attn_candidates:
+            try:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    model_path,
+                    torch_dtype=dtype,
+                    device_map=device,
+                    attn_implementation=attn_impl,
+                    quantization_config=quant_config,
+                )
+                break
+            except (ValueError, ImportError) as e:
+                # Only retry for attention-support errors; anything else (config,
+                # quantization, weights) would fail the same way for every candidate
+                if attn_impl == attn_candidates[-1] or not _is_attention_error(e):
+                    raise
+                print(f"Attention '{attn_impl}' unavailable, falling back: {e}")
         self.model.eval()
-
+        self.compiled = False
+        
+        # The system message and tool schemas never change, so render the chat
+        # template once and keep the text around the user turn
+        self._prompt_prefix, self._prompt_suffix = self._split_chat_template()
         
-        # Compile for speed (PyTorch 2.0+)
-        if compile_model:
+        # Compile the decoder step for speed (PyTorch 2.0+). reduce-overhead replays
+        # CUDA graphs, so this only pays off on GPU; CPU stays eager. bitsandbytes
+        # layers don't capture cleanly, so quantized models stay eager too.
+        if compile_model and device == "cuda" and quant_config is None:
+            eager_forward = self.model.forward
             try:
-                self.model = torch.compile(self.model, mode="reduce-overhead")
+                self.model.forward = torch.compile(
+                    eager_forward, mode="reduce-overhead", fullgraph=False
+                )
+                self.compiled = True
+                # Pay the compile cost now rather than on the first user query
+                self.route("warmup")
                 print("Model compiled with torch.compile()")
             except Exception as e:
+                self.model.forward = eager_forward
+                self.compiled = False
                 print(f"torch.compile() not available: {e}")
         
         print(f"Router loaded in {time.time() - start:.2f}s")
-        print(f"Device: {self.model.device}, Dtype: {self.model.dtype}")
+        print(f"Device: {self.model.device}, Dtype: {self.model.dtype}, Attention: {attn_impl}")
     
     @torch.inference_mode()
     def route(self, user_prompt: str) -> Tuple[str, Dict[str, Any]]:
@@ -242,19 +323,11 @@ class FunctionGemmaRouter:
         Returns:
             Tuple of (function_name, arguments_dict)
         """
-        # Build messages
-        messages = [
-            {"role": "developer", "content": SYSTEM_MSG},
-            {"role": "user", "content": user_prompt},
-        ]
-        
-        # Apply chat template
-        prompt = self.tokenizer.apply_chat_template(
-            messages,
-            tools=TOOLS,
-            add_generation_prompt=True,
-            tokenize=False
-        )
+        # Fill the user turn into the pre-rendered chat template
+        if self._prompt_prefix is not None:
+            prompt = self._prompt_prefix + user_prompt.strip() + self._prompt_suffix
+        else:
+            prompt = self._render_chat_template(user_prompt)
         
         # Tokenize
         inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
@@ -283,15 +356,45 @@ class FunctionGemmaRouter:
         # Parse function call
         return self._parse_function_call(response, user_prompt)
     
+    def _render_chat_template(self, user_prompt: str) -> str:
+        """Render the full prompt for one user turn."""
+        messages = [
+            {"role": "developer", "content": SYSTEM_MSG},
+            {"role": "user", "content": user_prompt},
+        ]
+        return self.tokenizer.apply_chat_template(
+            messages,
+            tools=TOOLS,
+            add_generation_prompt=True,
+            tokenize=False
+        )
+    
+    def _split_chat_template(self):
+        """
+        Render the template around a placeholder user turn and split it.
+        Returns (prefix, suffix), or (None, None) if the template doesn't
+        reproduce the placeholder verbatim.
+        """
+        sentinel = "\x00USER_PROMPT\x00"
+        try:
+            rendered = self._render_chat_template(sentinel)
+        except Exception:
+            return None, None
+        if rendered.count(sentinel) != 1:
+            return None, None
+        prefix, suffix = rendered.split(sentinel)
+        return prefix, suffix
+    
     def _parse_function_call(self, response: str, user_prompt: str) -> Tuple[str, Dict[str, Any]]:
         """Parse the model's response to extract function name and arguments."""
         
         # Try to find function call pattern: call:function_name
-        for func_name in VALID_FUNCTIONS:
-            if f"call:{func_name}" in response:
-                # Try to extract arguments
-                args = self._extract_arguments(response, func_name, user_prompt)
-                return func_name, args
+        match = _CALL_RE.search(response)
+        if match:
+            func_name = match.group(1)
+            # Try to extract arguments
+            args = self._extract_arguments(response, func_name, user_prompt)
+            return func_name, args
         
         # Fallback to nonthinking if no function found
         return "nonthinking", {"prompt": user_prompt}
@@ -309,8 +412,7 @@ class FunctionGemmaRouter:
         
         # Parse the model's custom format: {key:<escape>value<escape>,key2:<escape>value2<escape>}
         # Find the arguments block after the function name
-        pattern = rf"call:{func_name}\{{([^}}]+)\}}"
-        match = re.search(pattern, response)
+        match = _ARG_BLOCK_RES[func_name].search(response)
         
         if match:
             args_str = match.group(1)
@@ -319,8 +421,7 @@ class FunctionGemmaRouter:
             # Split by comma, but handle values with commas inside <escape> tags
             # Pattern: key:<escape>value<escape> OR key:value (for ints/bools)
             # We look for key followed by either <escape>...<escape> OR anything until comma/end
-            arg_pattern = r'(\w+):(?:<escape>([^<]*)<escape>|([^,]+))'
-            for arg_match in re.finditer(arg_pattern, args_str):
+            for arg_match in _ARG_RE.finditer(args_str):
                 key = arg_match.group(1)
                 # group(2) is escaped value, group(3) is unescaped value
                 val_escaped = arg_match.group(2)
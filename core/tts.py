@@ -81,6 +81,8 @@ class PiperTTS:
         self.worker_thread = None
         self.running = False
         self.interrupt_event = threading.Event()
+        self.ready = threading.Event()  # Set once initialize() has finished (success or not)
+        self._init_lock = threading.Lock()
         self.piper_dir = Path.home() / ".local" / "share" / "piper"
         self.models_dir = self.piper_dir / "voices"
         self.current_process = None
@@ -161,7 +163,20 @@ class PiperTTS:
         return str(model_path)
     
     def initialize(self):
-        """Set up Piper executable and voice model."""
+        """
+        Set up Piper executable and voice model.
+        Safe to call from several threads: concurrent callers wait for the
+        in-flight setup, and calls after a successful setup return immediately.
+        """
+        with self._init_lock:
+            if self.running:
+                return True
+            try:
+                return self._initialize()
+            finally:
+                self.ready.set()
+    
+    def _initialize(self):
         try:
             print(f"{CYAN}[TTS] Initializing Piper TTS (executable mode)...{RESET}")
             
@@ -70,10 +70,11 @@ class VoiceAssistant(QObject):
                 return False
             print(f"{CYAN}[VoiceAssistant] ✓ STT initialized{RESET}")
             
-            # Ensure TTS is initialized
-            if not tts.piper_exe:
-                print(f"{CYAN}[VoiceAssistant] Initializing TTS...{RESET}")
-                tts.initialize()
+            # Ensure TTS is initialized. If preload_models is already loading it,
+            # initialize() waits for that instead of starting a second setup.
+            if not tts.ready.is_set():
+                print(f"{CYAN}[VoiceAssistant] Waiting for TTS...{RESET}")
+            if tts.initialize():
                 print(f"{CYAN}[VoiceAssistant] ✓ TTS initialized{RESET}")
             
             print(f"{CYAN}[VoiceAssistant] ✓ Voice assistant initialized successfully{RESET}")
@@ -0,0 +1,89 @@
+import sys
+import os
+import unittest
+
+# Add core directory to path to bypass package init (avoids loading tts/sounddevice)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../core')))
+
+from function_executor import FunctionExecutor
+
+
+class ExecutorTestCase(unittest.TestCase):
+    """Shares one FunctionExecutor (and its background loop) per test class."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = FunctionExecutor()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+
+class TestDurationParsing(ExecutorTestCase):
+    def test_single_units(self):
+        self.assertEqual(self.executor._parse_duration("10 minutes"), 600)
+        self.assertEqual(self.executor._parse_duration("1 hour"), 3600)
+        self.assertEqual(self.executor._parse_duration("30 seconds"), 30)
+        self.assertEqual(self.executor._parse_duration("2 hrs"), 7200)
+        self.assertEqual(self.executor._parse_duration("90s"), 90)
+
+    def test_combined_units(self):
+        self.assertEqual(self.executor._parse_duration("1 hour 30 minutes"), 5400)
+        self.assertEqual(self.executor._parse_duration("1h30m"), 5400)
+        self.assertEqual(self.executor._parse_duration("2 Minutes 15 Seconds"), 135)
+
+    def test_bare_number_defaults_to_minutes(self):
+        self.assertEqual(self.executor._parse_duration("5"), 300)
+        self.assertEqual(self.executor._parse_duration(" 12 "), 720)
+
+    def test_bare_number_ignored_when_unit_present(self):
+        self.assertEqual(self.executor._parse_duration("1 hour and 30"), 3600)
+
+    def test_first_amount_per_unit_wins(self):
+        self.assertEqual(self.executor._parse_duration("5 minutes or 10 minutes"), 300)
+        self.assertEqual(self.executor._parse_duration("1 hour 5 minutes, no 10 minutes"), 3900)
+
+    def test_invalid(self):
+        self.assertEqual(self.executor._parse_duration(""), 0)
+        self.assertEqual(self.executor._parse_duration("a while"), 0)
+
+
+class TestSetTimer(ExecutorTestCase):
+    def test_numeric_params_skip_parsing(self):
+        result = self.executor.execute("set_timer", {"seconds": 90, "label": "tea"})
+        self.assertEqual(result["data"]["seconds"], 90)
+        result = self.executor.execute("set_timer", {"duration": 5, "label": "eggs"})
+        self.assertEqual(result["data"]["seconds"], 300)
+        result = self.executor.execute("set_timer", {"duration": "10 minutes"})
+        self.assertEqual(result["data"]["seconds"], 600)
+
+    def test_router_int_duration(self):
+        # The router turns "duration:5" into an int, which means 5 minutes
+        result = self.executor.execute("set_timer", {"duration": 5})
+        self.assertTrue(result["success"])
+        self.assertEqual(result["data"]["seconds"], 300)
+        self.assertEqual(result["data"]["duration"], "5 minutes")
+
+    def test_seconds_wins_over_duration_text(self):
+        result = self.executor.execute("set_timer", {"seconds": 2.7, "duration": "abc"})
+        self.assertEqual(result["data"]["seconds"], 2)
+        self.assertEqual(result["data"]["duration"], "2 seconds")
+
+    def test_invalid_duration(self):
+        result = self.executor.execute("set_timer", {"duration": "soon"})
+        self.assertFalse(result["success"])
+        self.assertFalse(self.executor.execute("set_timer", {"duration": True})["success"])
+        self.assertFalse(self.executor.execute("set_timer", {"seconds": True})["success"])
+
+
+class TestTimeNormalization(ExecutorTestCase):
+    def test_normalize_time(self):
+        self.assertEqual(self.executor._normalize_time("7am"), "07:00")
+        self.assertEqual(self.executor._normalize_time("7:30 PM"), "19:30")
+        self.assertEqual(self.executor._normalize_time("12am"), "00:00")
+        self.assertEqual(self.executor._normalize_time("14:30"), "14:30")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,9 +16,11 @@ class TestChatHistory(unittest.TestCase):
         self.mgr = ChatHistoryManager(db_path=TEST_DB)
         
     def tearDown(self):
-        # Cleanup
-        if os.path.exists(TEST_DB):
-            os.remove(TEST_DB)
+        # Cleanup (including WAL side files)
+        self.mgr.close()
+        for path in (TEST_DB, TEST_DB + "-wal", TEST_DB + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_create_session(self):
         sid = self.mgr.create_session("Test Session")